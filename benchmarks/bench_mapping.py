@@ -0,0 +1,57 @@
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import handlers
+from handlers import APIHandler
+
+
+def get_payload(subject_id: int, alias_count: int = 50) -> bytes:
+    return json.dumps(
+        {
+            "id": subject_id,
+            "name": f"subject {subject_id}",
+            "type": 2,
+            "date": "2024-01-01",
+            "name_cn": f"条目 {subject_id}",
+            "summary": "summary " * 50,
+            "rating": {
+                "score": 7.5,
+                "count": {str(score): score * 10 for score in range(1, 11)},
+                "total": 550,
+            },
+            "tags": [{"name": f"tag {index}", "count": index} for index in range(30)],
+            "infobox": [
+                {"key": "中文名", "value": f"条目 {subject_id}"},
+                {
+                    "key": "别名",
+                    "value": [{"v": f"alias {index}"} for index in range(alias_count)],
+                },
+                {"key": "话数", "value": "12"},
+                {"key": "放送开始", "value": "2024年1月1日"},
+            ],
+            "images": {"large": f"https://lain.bgm.tv/pic/cover/l/{subject_id}.jpg"},
+        },
+        ensure_ascii=False,
+    ).encode()
+
+
+def main(count: int = 1000, repeat: int = 5):
+    payloads = [get_payload(subject_id) for subject_id in range(count)]
+    subjects_json = [json.loads(payload) for payload in payloads]
+
+    print(f"json backend: {'orjson' if handlers.orjson is not None else 'json'}")
+    for label, statement in (
+        ("decode", lambda: [handlers.load_json(payload) for payload in payloads]),
+        ("mapping", lambda: APIHandler.get_subjects_from_json(subjects_json)),
+        ("decode+mapping", lambda: APIHandler.get_subjects_from_payloads(*payloads)),
+    ):
+        best = min(timeit.repeat(statement, number=1, repeat=repeat))
+        print(f"{label:>15}: {best / count * 1e6:8.2f} us/subject")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import requests
+from subjects import Subject
+
+
+class CoverCache:
+    """
+    A content-addressed on-disk store for subject cover images.
+
+    Blobs are named after the sha256 of their content, so covers shared by
+    several subjects are stored once. An index file maps every downloaded url
+    to its blob together with the validators needed for conditional re-fetch.
+
+    Attributes:
+    ----------
+    root : str
+        The directory holding the blobs and the index file.
+    max_bytes : int
+        The size bound of the store, 0 disables eviction.
+    workers : int
+        The number of parallel downloads.
+    size : str
+        The bgm.tv image size to download (large, common, medium, small, grid).
+    evicted : list[str]
+        The blob paths evicted from disk since the cache was opened.
+    replaced : dict[str, str]
+        The blob paths superseded by new content, mapped to their successors.
+    """
+
+    def __init__(
+        self,
+        root: str = "covers",
+        max_bytes: int = 0,
+        workers: int = 4,
+        size: str = "large",
+        headers: dict[str, str] | None = None,
+    ):
+        self.root: str = root
+        self.max_bytes: int = max_bytes
+        self.workers: int = max(1, workers)
+        self.size: str = size
+        self.headers: dict[str, str] = headers if headers is not None else {}
+        self.index_path: str = os.path.join(root, "index.json")
+        self.index: dict[str, dict] = self.load_index()
+        self.evicted: list[str] = []
+        self.replaced: dict[str, str] = {}
+
+    def load_index(self) -> dict[str, dict]:
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path, "r", encoding="utf-8") as indexfile:
+            return json.load(indexfile)
+
+    def save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as indexfile:
+            json.dump(self.index, indexfile)
+        os.replace(temp_path, self.index_path)
+
+    def get_blob_path(self, digest: str, extension: str) -> str:
+        return os.path.join(self.root, digest[:2], digest + extension)
+
+    @staticmethod
+    def get_extension_from_url(url: str) -> str:
+        extension = os.path.splitext(urlparse(url).path)[1].lower()
+        return extension if extension != "" else ".jpg"
+
+    def resolve(self, url: str) -> str | None:
+        entry = self.index.get(url)
+        if entry is None or not os.path.exists(entry["path"]):
+            return None
+        return entry["path"]
+
+    def download(self, url: str) -> dict | None:
+        """
+        Download a single url, revalidating against the cached copy if any.
+
+        Runs on worker threads, so it only reads the index and returns the new
+        entry instead of writing it back. Covers are best-effort, a failed
+        request yields None rather than aborting the whole batch.
+        """
+        headers = dict(self.headers)
+        entry = self.index.get(url)
+        cached = entry is not None and os.path.exists(entry["path"])
+        if cached:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("modified"):
+                headers["If-Modified-Since"] = entry["modified"]
+
+        try:
+            response = requests.get(url, headers=headers, timeout=30)
+        except requests.RequestException:
+            return None
+        if cached and response.status_code == 304:
+            return dict(entry, accessed=time.time())
+        if response.status_code != 200:
+            return None
+
+        digest = hashlib.sha256(response.content).hexdigest()
+        path = self.get_blob_path(digest, self.get_extension_from_url(url))
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{id(response)}.tmp"
+            with open(temp_path, "wb") as blobfile:
+                blobfile.write(response.content)
+            os.replace(temp_path, path)
+
+        return {
+            "path": path,
+            "bytes": len(response.content),
+            "etag": response.headers.get("ETag", ""),
+            "modified": response.headers.get("Last-Modified", ""),
+            "accessed": time.time(),
+        }
+
+    def resolve_subjects(self, *subjects: Subject):
+        """
+        Point each subject at its cached cover, marking the cover as used so
+        eviction keeps recently viewed covers.
+        """
+        accessed = time.time()
+        touched = False
+        for subject in subjects:
+            url = subject.images.get(self.size, "")
+            path = self.resolve(url)
+            subject.cover = path if path is not None else ""
+            if path is not None:
+                self.index[url]["accessed"] = accessed
+                touched = True
+        if touched:
+            self.save_index()
+
+    def store_subjects(self, *subjects: Subject):
+        urls = {
+            subject.images[self.size]
+            for subject in subjects
+            if subject.images.get(self.size)
+        }
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            entries = dict(zip(urls, executor.map(self.download, urls)))
+
+        for url, entry in entries.items():
+            if entry is None:
+                continue
+            previous = self.index.get(url)
+            self.index[url] = entry
+            if previous is not None and previous["path"] != entry["path"]:
+                self.remove_blob(previous["path"], entry["path"])
+        self.evict()
+        self.save_index()
+        self.resolve_subjects(*subjects)
+
+    def remove_blob(self, path: str, replacement: str | None = None):
+        """
+        Delete a blob from disk unless some indexed url still refers to it.
+        """
+        if any(entry["path"] == path for entry in self.index.values()):
+            return
+        if os.path.exists(path):
+            os.remove(path)
+        if replacement is not None:
+            self.replaced[path] = replacement
+        else:
+            self.evicted.append(path)
+
+    def evict(self):
+        if self.max_bytes <= 0:
+            return
+
+        blobs: dict[str, dict] = {}
+        for url, entry in self.index.items():
+            blob = blobs.setdefault(entry["path"], {"urls": [], "accessed": 0.0})
+            blob["urls"].append(url)
+            blob["bytes"] = entry["bytes"]
+            blob["accessed"] = max(blob["accessed"], entry["accessed"])
+
+        total = sum(blob["bytes"] for blob in blobs.values())
+        for path, blob in sorted(blobs.items(), key=lambda item: item[1]["accessed"]):
+            if total <= self.max_bytes:
+                break
+            for url in blob["urls"]:
+                del self.index[url]
+            self.remove_blob(path)
+            for previous, replacement in list(self.replaced.items()):
+                if replacement == path:
+                    del self.replaced[previous]
+                    self.evicted.append(previous)
+            total -= blob["bytes"]
@@ -1,10 +1,25 @@
 from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
 import requests
 import sqlite3
 import json
 from subjects import Subject, Rating, Tag
 from exceptions import SubjectNotFoundError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SUBJECT_TYPES = {1: "BOOK", 2: "ANIME", 3: "MUSIC", 4: "GAME", 6: "REAL"}
+ALIAS_KEYS = frozenset(("中文名", "别名"))
+
+
+def load_json(payload: bytes | str):
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
 
 class SubjectHandler(ABC):
     @abstractmethod
@@ -28,14 +43,14 @@ class APIHandler(SubjectHandler):
     def get_subject_from_json(subject_json: dict) -> Subject:
         subject = Subject(subject_json["id"])
         subject.name = subject_json["name"]
-        subject.type = {1: "BOOK", 2: "ANIME", 3: "MUSIC", 4: "GAME", 6: "REAL"}.get(
-            subject_json["type"], "OTHER"
-        )
+        subject.type = SUBJECT_TYPES.get(subject_json["type"], "OTHER")
         subject.date = subject_json["date"]
 
-        subject.aliases = (
-            [subject_json["name_cn"]] if subject_json["name_cn"] != "" else []
-        )
+        subject.aliases = []
+        seen_aliases = set()
+        if subject_json["name_cn"] != "":
+            subject.aliases.append(subject_json["name_cn"])
+            seen_aliases.add(subject_json["name_cn"])
         subject.summary = subject_json["summary"]
         subject.rating = Rating(
             subject_json["rating"]["score"],
@@ -43,28 +58,41 @@ class APIHandler(SubjectHandler):
             subject_json["rating"]["total"],
         )
 
-        subject.tags = []
-        for tag_json in subject_json["tags"]:
-            subject.tags.append(Tag(tag_json["name"], tag_json["count"]))
+        subject.tags = [
+            Tag(tag_json["name"], tag_json["count"])
+            for tag_json in subject_json["tags"]
+        ]
 
         subject.infobox = []
         for infoitem in subject_json["infobox"]:
-            if infoitem["key"] == "中文名":
-                if infoitem["value"] != "" and infoitem["value"] not in subject.aliases:
-                    subject.aliases.append(infoitem["value"])
-            if infoitem["key"] == "别名":
-                for aliasitem in infoitem["value"]:
-                    if aliasitem["v"] not in subject.aliases:
-                        subject.aliases.append(aliasitem["v"])
-            if isinstance(infoitem["value"], list):
-                subject.infobox.append(
-                    (infoitem["key"], [item["v"] for item in infoitem["value"]])
-                )
+            key, value = infoitem["key"], infoitem["value"]
+            if isinstance(value, list):
+                values = [item["v"] for item in value]
             else:
-                subject.infobox.append((infoitem["key"], [infoitem["value"]]))
-
+                values = [value]
+            if key in ALIAS_KEYS:
+                for alias in values:
+                    if alias in seen_aliases or (alias == "" and key == "中文名"):
+                        continue
+                    seen_aliases.add(alias)
+                    subject.aliases.append(alias)
+            subject.infobox.append((key, values))
+
+        subject.images = (
+            dict(subject_json["images"]) if subject_json.get("images") else {}
+        )
+        subject.cover = ""
         return subject
 
+    @staticmethod
+    def get_subjects_from_json(subjects_json: Iterable[dict]) -> list[Subject]:
+        get_subject = APIHandler.get_subject_from_json
+        return [get_subject(subject_json) for subject_json in subjects_json]
+
+    @staticmethod
+    def get_subjects_from_payloads(*payloads: bytes | str) -> list[Subject]:
+        return APIHandler.get_subjects_from_json(map(load_json, payloads))
+
     def check_subject(self, subject_id) -> bool:
         response = requests.get(
             f"https://api.bgm.tv/v0/subjects/{subject_id}", headers=self.headers
@@ -78,7 +106,7 @@ class APIHandler(SubjectHandler):
         response = requests.get(
             f"https://api.bgm.tv/v0/subjects/{subject_id}", headers=self.headers
         )
-        return self.get_subject_from_json(response.json())
+        return self.get_subject_from_json(load_json(response.content))
 
     def search_subjects(self, keyword: str) -> list[Subject]:
         response = requests.post(
@@ -86,10 +114,7 @@ class APIHandler(SubjectHandler):
             data=json.dumps({"keyword": keyword}),
             headers=self.headers,
         )
-        return [
-            self.get_subject_from_json(subject_json)
-            for subject_json in response.json()["data"]
-        ]
+        return self.get_subjects_from_json(load_json(response.content)["data"])
 
 
 class DBHandler(SubjectHandler):
@@ -106,9 +131,23 @@ class DBHandler(SubjectHandler):
             "RATING TEXT, "
             "TAGS TEXT, "
             "INFOBOX TEXT, "
+            "IMAGES TEXT, "
+            "COVER TEXT, "
             "PRIMARY KEY (ID)"
             ")"
         )
+        columns = {
+            column
+            for _, column, *_ in self.connection.execute(
+                "PRAGMA table_info(SUBJECTS)"
+            ).fetchall()
+        }
+        for column in ("IMAGES", "COVER"):
+            if column not in columns:
+                self.connection.execute(
+                    f"ALTER TABLE SUBJECTS ADD COLUMN {column} TEXT"
+                )
+        self.connection.commit()
 
     def __del__(self):
         self.connection.close()
@@ -177,6 +216,28 @@ class DBHandler(SubjectHandler):
     def get_infobox_field_from_subject(subject: Subject) -> str:
         return json.dumps(subject.infobox, ensure_ascii=False)
 
+    @staticmethod
+    def get_images_from_field(field: str | None) -> dict[str, str]:
+        if field is None:
+            return {}
+        return json.loads(field)
+
+    @staticmethod
+    def get_images_field_from_subject(subject: Subject) -> str:
+        return json.dumps(subject.images)
+
+    @staticmethod
+    def get_cover_from_field(field: str | None) -> str:
+        if field is None:
+            return ""
+        return field
+
+    @staticmethod
+    def get_cover_field_from_subject(subject: Subject) -> str:
+        if subject.cover == "":
+            return None
+        return subject.cover
+
     def check_subject(self, subject_id: int) -> bool:
         return (
             self.connection.execute(
@@ -218,6 +279,16 @@ class DBHandler(SubjectHandler):
                 "SELECT INFOBOX FROM SUBJECTS WHERE ID = ?", (subject_id,)
             ).fetchone()[0]
         )
+        subject.images = self.get_images_from_field(
+            self.connection.execute(
+                "SELECT IMAGES FROM SUBJECTS WHERE ID = ?", (subject_id,)
+            ).fetchone()[0]
+        )
+        subject.cover = self.get_cover_from_field(
+            self.connection.execute(
+                "SELECT COVER FROM SUBJECTS WHERE ID = ?", (subject_id,)
+            ).fetchone()[0]
+        )
         return subject
 
     def fetch_all_subjects(self) -> list[Subject]:
@@ -256,6 +327,16 @@ class DBHandler(SubjectHandler):
                     "SELECT INFOBOX FROM SUBJECTS WHERE ID = ?", (subject.id,)
                 ).fetchone()[0]
             )
+            subject.images = self.get_images_from_field(
+                self.connection.execute(
+                    "SELECT IMAGES FROM SUBJECTS WHERE ID = ?", (subject.id,)
+                ).fetchone()[0]
+            )
+            subject.cover = self.get_cover_from_field(
+                self.connection.execute(
+                    "SELECT COVER FROM SUBJECTS WHERE ID = ?", (subject.id,)
+                ).fetchone()[0]
+            )
         return subjects
 
     def search_subjects(self, keyword: str) -> list[Subject]:
@@ -295,8 +376,35 @@ class DBHandler(SubjectHandler):
                     "SELECT INFOBOX FROM SUBJECTS WHERE ID = ?", (subject.id,)
                 ).fetchone()[0]
             )
+            subject.images = self.get_images_from_field(
+                self.connection.execute(
+                    "SELECT IMAGES FROM SUBJECTS WHERE ID = ?", (subject.id,)
+                ).fetchone()[0]
+            )
+            subject.cover = self.get_cover_from_field(
+                self.connection.execute(
+                    "SELECT COVER FROM SUBJECTS WHERE ID = ?", (subject.id,)
+                ).fetchone()[0]
+            )
         return subjects
 
+    def fetch_subject_rows(self, keyword: str | None = None) -> Iterator[dict]:
+        query = "SELECT ID, NAME, TYPE, DATE, RATING, COVER FROM SUBJECTS"
+        parameters = ()
+        if keyword is not None:
+            query += " WHERE NAME LIKE ? OR ALIASES LIKE ?"
+            parameters = (f"%{keyword}%", f"%{keyword}%")
+        cursor = self.connection.execute(query, parameters)
+        for subject_id, name, subject_type, date, rating, cover in cursor:
+            yield {
+                "id": subject_id,
+                "type": subject_type,
+                "date": date,
+                "rating": self.get_rating_from_field(rating),
+                "name": name,
+                "cover": self.get_cover_from_field(cover),
+            }
+
     def update_subjects(self, *subjects: Subject):
         for subject in subjects:
             self.connection.execute(
@@ -323,6 +431,14 @@ class DBHandler(SubjectHandler):
                 "UPDATE SUBJECTS SET INFOBOX = ? WHERE ID = ?",
                 (self.get_infobox_field_from_subject(subject), subject.id),
             )
+            self.connection.execute(
+                "UPDATE SUBJECTS SET IMAGES = ? WHERE ID = ?",
+                (self.get_images_field_from_subject(subject), subject.id),
+            )
+            self.connection.execute(
+                "UPDATE SUBJECTS SET COVER = ? WHERE ID = ?",
+                (self.get_cover_field_from_subject(subject), subject.id),
+            )
         self.connection.commit()
 
     def insert_subjects(self, *subjects: Subject):
@@ -351,6 +467,29 @@ class DBHandler(SubjectHandler):
                 "UPDATE SUBJECTS SET INFOBOX = ? WHERE ID = ?",
                 (self.get_infobox_field_from_subject(subject), subject.id),
             )
+            self.connection.execute(
+                "UPDATE SUBJECTS SET IMAGES = ? WHERE ID = ?",
+                (self.get_images_field_from_subject(subject), subject.id),
+            )
+            self.connection.execute(
+                "UPDATE SUBJECTS SET COVER = ? WHERE ID = ?",
+                (self.get_cover_field_from_subject(subject), subject.id),
+            )
+        self.connection.commit()
+
+    def replace_covers(self, replaced: dict[str, str]):
+        for previous, replacement in replaced.items():
+            self.connection.execute(
+                "UPDATE SUBJECTS SET COVER = ? WHERE COVER = ?",
+                (replacement, previous),
+            )
+        self.connection.commit()
+
+    def clear_covers(self, *paths: str):
+        for path in paths:
+            self.connection.execute(
+                "UPDATE SUBJECTS SET COVER = NULL WHERE COVER = ?", (path,)
+            )
         self.connection.commit()
 
     def remove_subjects(self, *subjects: Subject):
@@ -1,6 +1,8 @@
 import argparse
+import os
+import sys
 import configparser
-import handlers, view
+import handlers, view, covers
 from subjects import Subject
 from exceptions import SubjectNotFoundError
 
@@ -11,7 +13,8 @@ def main():
     config = configparser.ConfigParser()
     if not config.read("acgnx.ini"):
         with open("acgnx.ini", "w") as configfile:
-            config["PATH"] = {"dbpath": "acgnx.db"}
+            config["PATH"] = {"dbpath": "acgnx.db", "coverpath": "covers"}
+            config["COVER"] = {"maxbytes": "0", "workers": "4", "size": "large"}
             config.write(configfile)
 
     config.read("acgnx.ini")
@@ -35,6 +38,13 @@ def main():
     list_condition.add_argument(
         "-a", "--all", action="store_true", help="list all subjects"
     )
+    list_parser.add_argument(
+        "-f",
+        "--format",
+        choices=view.OUTPUT_FORMATS,
+        default="table",
+        help="output format of listed subjects",
+    )
 
     # View Command Parser
     view_parser = subparsers.add_parser("view", help="view subject with id")
@@ -47,12 +57,18 @@ def main():
     update_parser.add_argument(
         "id", type=int, help="to-be-updated subject id", default=0
     )
+    update_parser.add_argument(
+        "-c", "--covers", action="store_true", help="download subject covers"
+    )
 
     # Fetch Command Parser
     fetch_parser = subparsers.add_parser(
         "fetch", help="fetch subject based on subject id"
     )
     fetch_parser.add_argument("id", type=int, help="to-be-fetched subject id")
+    fetch_parser.add_argument(
+        "-c", "--covers", action="store_true", help="download subject covers"
+    )
 
     # Remove Command Parser
     remove_parser = subparsers.add_parser(
@@ -69,22 +85,33 @@ def main():
     # Initialize handlers
     apihandler = handlers.APIHandler()
     dbhandler = handlers.DBHandler(config.get("PATH", "dbpath"))
+    if args.command in ("fetch", "update", "view"):
+        covercache = covers.CoverCache(
+            config.get("PATH", "coverpath", fallback="covers"),
+            config.getint("COVER", "maxbytes", fallback=0),
+            config.getint("COVER", "workers", fallback=4),
+            config.get("COVER", "size", fallback="large"),
+            apihandler.headers,
+        )
 
     match args.command:
 
         case "list":
-            if args.all:
-                viewer = view.Viewer(dbhandler.fetch_all_subjects())
-                viewer.list_subjects()
-            elif args.name is not None:
-                viewer = view.Viewer(dbhandler.search_subjects(args.name))
-                viewer.list_subjects()
+            viewer = view.Viewer()
+            try:
+                viewer.list_subjects(
+                    args.format, rows=dbhandler.fetch_subject_rows(args.name)
+                )
+            except BrokenPipeError:
+                # downstream reader closed early, silence the flush at exit
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
             return
 
         case "view":
             try:
                 viewer = view.Viewer([Subject(args.id)], view.Updater(dbhandler))
                 viewer.update_subjects()
+                covercache.resolve_subjects(*viewer.subjects)
                 viewer.view_subject()
             except SubjectNotFoundError as error:
                 print(f"Error: {error}")
@@ -97,7 +124,13 @@ def main():
                         dbhandler.fetch_all_subjects(), view.Updater(apihandler)
                     )
                     viewer.update_subjects()
+                    if args.covers:
+                        covercache.store_subjects(*viewer.subjects)
+                    else:
+                        covercache.resolve_subjects(*viewer.subjects)
                     dbhandler.update_subjects(*viewer.subjects)
+                    dbhandler.replace_covers(covercache.replaced)
+                    dbhandler.clear_covers(*covercache.evicted)
                     viewer.list_subjects()
                     print("All required subjects updated")
                 except SubjectNotFoundError as error:
@@ -109,7 +142,13 @@ def main():
                         [dbhandler.fetch_subject(args.id)], view.Updater(apihandler)
                     )
                     viewer.update_subjects()
+                    if args.covers:
+                        covercache.store_subjects(*viewer.subjects)
+                    else:
+                        covercache.resolve_subjects(*viewer.subjects)
                     dbhandler.update_subjects(*viewer.subjects)
+                    dbhandler.replace_covers(covercache.replaced)
+                    dbhandler.clear_covers(*covercache.evicted)
                     viewer.list_subjects()
                     print("All required subjects updated")
                 except SubjectNotFoundError as error:
@@ -121,7 +160,13 @@ def main():
             viewer = view.Viewer([Subject(args.id)], updater)
             try:
                 viewer.update_subjects()
+                if args.covers:
+                    covercache.store_subjects(*viewer.subjects)
+                else:
+                    covercache.resolve_subjects(*viewer.subjects)
                 dbhandler.insert_subjects(*viewer.subjects)
+                dbhandler.replace_covers(covercache.replaced)
+                dbhandler.clear_covers(*covercache.evicted)
                 viewer.list_subjects()
                 print("All required subject fetched")
             except SubjectNotFoundError as error:
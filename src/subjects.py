@@ -22,6 +22,10 @@ class Subject:
         A list of tags associated with the subject.
     infobox : list[tuple[str, str | list[str]]]
         A list of key-value pairs containing additional information about the subject.
+    images : dict[str, str]
+        The cover image urls of the subject keyed by size.
+    cover : str
+        The local path of the cached cover image, empty if not cached.
 
     Methods:
     -------
@@ -40,6 +44,8 @@ class Subject:
         self.rating: Rating
         self.tags: list[Tag]
         self.infobox: list[tuple[str, str | list[str]]]
+        self.images: dict[str, str]
+        self.cover: str
 
 
 class Tag:
@@ -1,6 +1,77 @@
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+import unicodedata
+from typing import Iterator, TextIO
 from subjects import Subject
 from handlers import SubjectHandler
 
+OUTPUT_FORMATS = ("table", "tsv", "jsonl", "csv")
+TABLE_COLUMNS = (
+    ("id", "ID", "right", 6),
+    ("type", "TYPE", "center", 6),
+    ("date", "DATE", "center", 10),
+    ("rating", "RATE", "left", 12),
+    ("name", "NAME", "left", None),
+)
+TABLE_SAMPLE_SIZE = 1000
+RECORD_COLUMNS = ("id", "type", "date", "score", "total", "name", "cover")
+BUFFER_SIZE = 1 << 16
+
+
+def get_display_width(text: str) -> int:
+    width = 0
+    for char in text:
+        if unicodedata.combining(char):
+            continue
+        width += 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+    return width
+
+
+def pad_display(text: str, width: int, align: str = "left") -> str:
+    padding = max(0, width - get_display_width(text))
+    match align:
+        case "right":
+            return " " * padding + text
+        case "center":
+            return " " * (padding // 2) + text + " " * (padding - padding // 2)
+        case _:
+            return text + " " * padding
+
+
+def escape_text(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def get_record(row: dict) -> tuple:
+    return (
+        row["id"],
+        row["type"],
+        row["date"],
+        row["rating"].score,
+        row["rating"].total,
+        row["name"],
+        row["cover"],
+    )
+
+
+def flush_buffer(buffer: io.StringIO, stream: TextIO, force: bool = False):
+    if not force and buffer.tell() < BUFFER_SIZE:
+        return
+    stream.write(buffer.getvalue())
+    buffer.seek(0)
+    buffer.truncate()
+    if force:
+        stream.flush()
+
 
 class Viewer:
     def __init__(
@@ -13,34 +84,102 @@ class Viewer:
         self.updater: "Updater" = updater if updater is not None else Updater()
         self.selector: "Selector" = selector if selector is not None else Selector()
 
-    def list_subjects(self):
-        id_width = 6
-        type_width = 6
-        date_width = 10
-        rate_width = 12
-        name_width = 30
-        print(
-            "ID".center(id_width),
-            "TYPE".center(type_width),
-            "DATE".center(date_width),
-            "RATE".center(rate_width),
-            "NAME".center(name_width),
-        )
-        print(
-            "-" * id_width,
-            "-" * type_width,
-            "-" * date_width,
-            "-" * rate_width,
-            "-" * name_width,
-        )
+    def get_rows(self) -> Iterator[dict]:
         for subject in self.subjects:
-            print(
-                str(subject.id).rjust(id_width),
-                str(subject.type).center(type_width),
-                str(subject.date).center(date_width),
-                str(subject.rating).ljust(rate_width),
-                str(subject.name).ljust(name_width),
-            )
+            yield {
+                "id": subject.id,
+                "type": subject.type,
+                "date": subject.date,
+                "rating": subject.rating,
+                "name": subject.name,
+                "cover": subject.cover,
+            }
+
+    def list_subjects(
+        self,
+        output_format: str = "table",
+        stream: TextIO | None = None,
+        rows: Iterator[dict] | None = None,
+    ):
+        stream = stream if stream is not None else sys.stdout
+        buffer = io.StringIO()
+        rows = rows if rows is not None else self.get_rows()
+
+        match output_format:
+            case "table":
+                sample = list(itertools.islice(rows, TABLE_SAMPLE_SIZE))
+                # only the trailing NAME column is sized from the sample, so
+                # wider names past the sample overflow without shifting columns
+                widths = {
+                    key: (
+                        width
+                        if width is not None
+                        else max(
+                            [get_display_width(title)]
+                            + [
+                                get_display_width(escape_text(str(row[key])))
+                                for row in sample
+                            ]
+                        )
+                    )
+                    for key, title, _, width in TABLE_COLUMNS
+                }
+                buffer.write(
+                    " ".join(
+                        pad_display(title, widths[key], "center")
+                        for key, title, _, _ in TABLE_COLUMNS
+                    ).rstrip()
+                    + "\n"
+                )
+                buffer.write(
+                    " ".join("-" * widths[key] for key, _, _, _ in TABLE_COLUMNS)
+                    + "\n"
+                )
+                for row in itertools.chain(sample, rows):
+                    buffer.write(
+                        " ".join(
+                            pad_display(
+                                escape_text(str(row[key])), widths[key], align
+                            )
+                            for key, _, align, _ in TABLE_COLUMNS
+                        ).rstrip()
+                        + "\n"
+                    )
+                    flush_buffer(buffer, stream)
+
+            case "tsv":
+                buffer.write("\t".join(RECORD_COLUMNS) + "\n")
+                for row in rows:
+                    buffer.write(
+                        "\t".join(
+                            escape_text(str(value)) for value in get_record(row)
+                        )
+                        + "\n"
+                    )
+                    flush_buffer(buffer, stream)
+
+            case "csv":
+                writer = csv.writer(buffer, lineterminator="\n")
+                writer.writerow(RECORD_COLUMNS)
+                for row in rows:
+                    writer.writerow(get_record(row))
+                    flush_buffer(buffer, stream)
+
+            case "jsonl":
+                for row in rows:
+                    buffer.write(
+                        json.dumps(
+                            dict(zip(RECORD_COLUMNS, get_record(row))),
+                            ensure_ascii=False,
+                        )
+                        + "\n"
+                    )
+                    flush_buffer(buffer, stream)
+
+            case _:
+                raise ValueError(f"Unknown output format {output_format}")
+
+        flush_buffer(buffer, stream, force=True)
 
     def view_subject(self):
         subject = self.subjects[0]
@@ -48,6 +187,10 @@ class Viewer:
         print("NAME:", subject.name)
         print("TYPE:", subject.type)
         print("DATE:", subject.date)
+        if subject.cover != "" and os.path.exists(subject.cover):
+            print("COVER:", subject.cover)
+        elif subject.images.get("large"):
+            print("COVER:", subject.images["large"])
 
         print("ALIASES:")
         print(*subject.aliases, sep="\n")